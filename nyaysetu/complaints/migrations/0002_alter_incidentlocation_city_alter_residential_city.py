@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-15 21:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('complaints', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='incidentlocation',
+            name='city',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='residential',
+            name='city',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+    ]
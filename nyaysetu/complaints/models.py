@@ -5,7 +5,7 @@ from django.contrib.auth.models import User
 class Residential(models.Model):
     house_number = models.CharField(max_length=50)
     landmark = models.CharField(max_length=150, blank=True, null=True)
-    city = models.CharField(max_length=100)
+    city = models.CharField(max_length=100, db_index=True)
     state = models.CharField(max_length=100)
     pincode = models.CharField(max_length=10)
 
@@ -14,7 +14,7 @@ class Residential(models.Model):
 
 
 class IncidentLocation(models.Model):
-    city = models.CharField(max_length=100)
+    city = models.CharField(max_length=100, db_index=True)
     state = models.CharField(max_length=100)
     location = models.CharField(max_length=150)  # e.g. "Market Area", "Park"
     landmark = models.CharField(max_length=150, blank=True, null=True)
@@ -1,13 +1,26 @@
+import json
+
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.models import User
 from rest_framework import serializers, viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
-from django.db.models import F, Q
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, F, OuterRef, Prefetch, Q
 
 from .models import LawyerProfile, City, SPECIALIZATIONS, ContactRequest
 from complaints.models import Complaint
-from django.db import IntegrityError
+
+
+# SPECIALIZATIONS is static, so render the JSON response body once at import time
+_SPEC_JSON = json.dumps([{"key": k, "label": v} for k, v in SPECIALIZATIONS]).encode()
+
+# Rankings change slowly, so the top_lawyers rows are cached once and paginated per request
+TOP_LAWYERS_CACHE_KEY = "lawyers:top"
+TOP_LAWYERS_CACHE_TIMEOUT = 300
 
 
 # Serializers
@@ -63,12 +76,15 @@ class LawyerProfileSerializer(serializers.ModelSerializer):
         # service_cities comes via source mapping when writing service_city_ids
         cities = validated_data.pop("service_cities", [])
         request = self.context.get("request")
-        user = getattr(request, "user", None)
+        user = validated_data.pop("user", None) or getattr(request, "user", None)
         if user is None or not user.is_authenticated:
             raise serializers.ValidationError({"detail": "Authentication required to create a profile."})
-        if hasattr(user, "lawyer_profile"):
+        # Rely on the one-to-one unique constraint rather than checking first
+        try:
+            with transaction.atomic():
+                profile = LawyerProfile.objects.create(user=user, **validated_data)
+        except IntegrityError:
             raise serializers.ValidationError({"detail": "Profile already exists for this user."})
-        profile = LawyerProfile.objects.create(user=user, **validated_data)
         if cities:
             profile.service_cities.set(cities)
         return profile
@@ -87,20 +103,11 @@ class LawyerProfileSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("You can select up to 4 cities.")
         return value
 
-class ComplaintBriefSerializer(serializers.ModelSerializer):
-    incident_city = serializers.CharField(source="incident_location.city", read_only=True)
-    residential_city = serializers.CharField(source="residential_address.city", read_only=True)
+class LawyerProfileListSerializer(LawyerProfileSerializer):
+    # List views skip the potentially large bio TextField
+    class Meta(LawyerProfileSerializer.Meta):
+        fields = [f for f in LawyerProfileSerializer.Meta.fields if f != "bio"]
 
-    class Meta:
-        model = Complaint
-        fields = [
-            "id",
-            "title",
-            "created_at",
-            "privacy_option",
-            "incident_city",
-            "residential_city",
-        ]
 
 class ContactRequestSerializer(serializers.ModelSerializer):
     class Meta:
@@ -109,6 +116,13 @@ class ContactRequestSerializer(serializers.ModelSerializer):
         read_only_fields = ["user", "status", "created_at"]
 
 
+# Pagination
+class LawyerResultsPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
 # ViewSets
 class CityViewSet(viewsets.ModelViewSet):
     queryset = City.objects.all().order_by("name")
@@ -120,13 +134,43 @@ class LawyerProfileViewSet(viewsets.ModelViewSet):
     serializer_class = LawyerProfileSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
-    def get_queryset(self):
-        qs = (
+    def _base_qs(self):
+        return (
             LawyerProfile.objects.select_related("user")
-            .prefetch_related("service_cities")
-            .all()
+            .prefetch_related(Prefetch("service_cities", queryset=City.objects.only("id", "name")))
+            .only(
+                "id",
+                "specialization",
+                "experience_years",
+                "license_number",
+                "bio",
+                "contact_number",
+                "address",
+                "rating",
+                "total_cases",
+                "won_cases",
+                "user__id",
+                "user__first_name",
+                "user__last_name",
+            )
         )
 
+    def _paginated_response(self, request, rows):
+        # Only the case and top-lawyer actions are paginated; the default list is not
+        paginator = LawyerResultsPagination()
+        page = paginator.paginate_queryset(rows, request, view=self)
+        return paginator.get_paginated_response(page)
+
+    def get_serializer_class(self):
+        if self.action in {"list", "top_lawyers"}:
+            return LawyerProfileListSerializer
+        return super().get_serializer_class()
+
+    def get_queryset(self):
+        qs = self._base_qs()
+        if self.action == "list":
+            qs = qs.defer("bio")
+
         # Filtering via query params
         params = self.request.query_params
         specialization = params.get("specialization")
@@ -137,10 +181,14 @@ class LawyerProfileViewSet(viewsets.ModelViewSet):
         if specialization:
             qs = qs.filter(specialization=specialization)
         if city:
+            # EXISTS keeps one row per lawyer, so no DISTINCT over the M2M join is needed
+            through = LawyerProfile.service_cities.through
+            sub = through.objects.filter(lawyerprofile_id=OuterRef("pk"))
             if str(city).isdigit():
-                qs = qs.filter(service_cities__id=int(city))
+                sub = sub.filter(city_id=int(city))
             else:
-                qs = qs.filter(service_cities__name__iexact=city)
+                sub = sub.filter(city__name__iexact=city)
+            qs = qs.filter(Exists(sub))
         if min_exp and str(min_exp).isdigit():
             qs = qs.filter(experience_years__gte=int(min_exp))
         if q:
@@ -151,33 +199,37 @@ class LawyerProfileViewSet(viewsets.ModelViewSet):
                 | Q(license_number__icontains=q)
             )
 
-        return qs.distinct()
+        return qs
 
     def perform_create(self, serializer):
         user = self.request.user
         if not user.is_authenticated:
             raise serializers.ValidationError({"detail": "Authentication required."})
-        if hasattr(user, "lawyer_profile"):
-            raise serializers.ValidationError({"detail": "Profile already exists for this user."})
         serializer.save(user=user)
 
     @action(detail=False, methods=["get"], url_path="specializations")
     def list_specializations(self, request):
-        data = [{"key": k, "label": v} for k, v in SPECIALIZATIONS]
-        return Response(data)
+        return HttpResponse(
+            _SPEC_JSON,
+            content_type="application/json",
+            headers={"Cache-Control": "public, max-age=86400"},
+        )
 
     @action(detail=False, methods=["get"], url_path="top")
     def top_lawyers(self, request):
-        qs = self.get_queryset().order_by("-rating", "-won_cases")[:10]
-        serializer = self.get_serializer(qs, many=True)
-        return Response(serializer.data)
+        rows = cache.get(TOP_LAWYERS_CACHE_KEY)
+        if rows is None:
+            qs = self._base_qs().defer("bio").order_by("-rating", "-won_cases", "pk")[:10]
+            rows = self.get_serializer(qs, many=True).data
+            cache.set(TOP_LAWYERS_CACHE_KEY, rows, TOP_LAWYERS_CACHE_TIMEOUT)
+        return self._paginated_response(request, rows)
 
     @action(detail=True, methods=["post"], url_path="add-city", permission_classes=[permissions.IsAuthenticated])
     def add_city(self, request, pk=None):
         city_id = request.data.get("city_id")
         if not city_id:
             return Response({"detail": "city_id is required."}, status=status.HTTP_400_BAD_REQUEST)
-        city = get_object_or_404(City, pk=city_id)
+        city = get_object_or_404(City.objects.only("id", "name"), pk=city_id)
         profile = self.get_object()
         profile.service_cities.add(city)
         return Response({"status": "added", "city": CitySerializer(city).data})
@@ -187,7 +239,7 @@ class LawyerProfileViewSet(viewsets.ModelViewSet):
         city_id = request.data.get("city_id")
         if not city_id:
             return Response({"detail": "city_id is required."}, status=status.HTTP_400_BAD_REQUEST)
-        city = get_object_or_404(City, pk=city_id)
+        city = get_object_or_404(City.objects.only("id", "name"), pk=city_id)
         profile = self.get_object()
         profile.service_cities.remove(city)
         return Response({"status": "removed", "city": CitySerializer(city).data})
@@ -197,19 +249,23 @@ class LawyerProfileViewSet(viewsets.ModelViewSet):
         won = request.data.get("won")
         won_flag = str(won).lower() in {"true", "1", "yes"}
         profile = self.get_object()
-        profile.total_cases = F("total_cases") + 1
-        if won_flag:
-            profile.won_cases = F("won_cases") + 1
-        profile.save(update_fields=["total_cases", "won_cases"])
-        profile.refresh_from_db()
-        return Response({"total_cases": profile.total_cases, "won_cases": profile.won_cases})
+        counters = LawyerProfile.objects.filter(pk=profile.pk)
+        counters.update(
+            total_cases=F("total_cases") + 1,
+            won_cases=F("won_cases") + (1 if won_flag else 0),
+        )
+        return Response(counters.values("total_cases", "won_cases").first())
 
     @action(detail=False, methods=["get", "put", "patch"], url_path="me", permission_classes=[permissions.IsAuthenticated])
     def me(self, request):
         # Get or update the current user's lawyer profile
-        try:
-            instance = request.user.lawyer_profile
-        except LawyerProfile.DoesNotExist:
+        instance = (
+            LawyerProfile.objects.select_related("user")
+            .prefetch_related(Prefetch("service_cities", queryset=City.objects.only("id", "name")))
+            .filter(user=request.user)
+            .first()
+        )
+        if instance is None:
             if request.method in ["PUT", "PATCH"]:
                 serializer = self.get_serializer(data=request.data)
                 serializer.is_valid(raise_exception=True)
@@ -231,9 +287,10 @@ class LawyerProfileViewSet(viewsets.ModelViewSet):
     def contact(self, request, pk=None):
         lawyer = self.get_object()
         message = request.data.get("message", "")
-        try:
-            cr = ContactRequest.objects.create(user=request.user, lawyer=lawyer, message=message)
-        except IntegrityError:
+        cr, created = ContactRequest.objects.get_or_create(
+            user=request.user, lawyer=lawyer, defaults={"message": message}
+        )
+        if not created:
             return Response({"detail": "Request already sent."}, status=status.HTTP_400_BAD_REQUEST)
         return Response(ContactRequestSerializer(cr).data, status=status.HTTP_201_CREATED)
 
@@ -243,12 +300,23 @@ class LawyerProfileViewSet(viewsets.ModelViewSet):
             profile = request.user.lawyer_profile
         except LawyerProfile.DoesNotExist:
             return Response({"detail": "Lawyer profile required."}, status=status.HTTP_403_FORBIDDEN)
-        names = list(profile.service_cities.values_list("name", flat=True))
-        qs = Complaint.objects.filter(
-            Q(incident_location__city__in=names) | Q(residential_address__city__in=names)
-        ).order_by("-created_at")
-        data = ComplaintBriefSerializer(qs, many=True).data
-        return Response(data)
+        # Passed as a subquery so the city names never round-trip through Python
+        names = profile.service_cities.values("name")
+        qs = (
+            Complaint.objects.filter(
+                Q(incident_location__city__in=names) | Q(residential_address__city__in=names)
+            )
+            .order_by("-created_at")
+            .values(
+                "id",
+                "title",
+                "created_at",
+                "privacy_option",
+                incident_city=F("incident_location__city"),
+                residential_city=F("residential_address__city"),
+            )
+        )
+        return self._paginated_response(request, qs)
 
     @action(detail=False, methods=["get"], url_path="search-cases", permission_classes=[permissions.IsAuthenticated])
     def search_cases(self, request):
@@ -258,13 +326,26 @@ class LawyerProfileViewSet(viewsets.ModelViewSet):
             tokens = [t.strip() for t in cities_param.split(",") if t.strip()]
             id_tokens = [int(t) for t in tokens if t.isdigit()]
             name_tokens = [t for t in tokens if not t.isdigit()]
-            if id_tokens:
-                names.extend(list(City.objects.filter(id__in=id_tokens).values_list("name", flat=True)))
-            if name_tokens:
-                names.extend(name_tokens)
+            # Resolve ids and validate names against known cities in one query
+            names = list(
+                City.objects.filter(Q(id__in=id_tokens) | Q(name__in=name_tokens))
+                .values_list("name", flat=True)
+                .distinct()
+            )
         if not names:
             return Response({"detail": "Provide cities by id or name."}, status=status.HTTP_400_BAD_REQUEST)
-        qs = Complaint.objects.filter(
-            Q(incident_location__city__in=names) | Q(residential_address__city__in=names)
-        ).order_by("-created_at")
-        return Response(ComplaintBriefSerializer(qs, many=True).data)
+        qs = (
+            Complaint.objects.filter(
+                Q(incident_location__city__in=names) | Q(residential_address__city__in=names)
+            )
+            .order_by("-created_at")
+            .values(
+                "id",
+                "title",
+                "created_at",
+                "privacy_option",
+                incident_city=F("incident_location__city"),
+                residential_city=F("residential_address__city"),
+            )
+        )
+        return self._paginated_response(request, qs)